@@ -0,0 +1,137 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Optional Cython build of the mini_compiler VM dispatch loop.
+
+Build in place with:
+
+    cythonize -3 --inplace cvm.pyx
+
+mini_compiler picks CVM up automatically when the extension is present.
+The opcode numbering must stay in sync with mini_compiler.py.
+"""
+
+from array import array
+
+cdef enum:
+    OP_NEG = 0
+    OP_PRINT = 1
+    OP_ADD_II = 2
+    OP_ADD_RR = 3
+    OP_SUB_II = 4
+    OP_SUB_RR = 5
+    OP_MUL_II = 6
+    OP_MUL_RR = 7
+    OP_DUP = 8
+    OP_PUSH = 0x80
+    OP_LOAD = 0x81
+    OP_STORE = 0x82
+    OP_BINOP = 0x83
+    OP_LOAD_LOAD_BINOP = 0x84
+    OP_PUSH_BINOP = 0x85
+    OP_LOAD_BINOP = 0x86
+
+# mini_compiler's sentinel, fetched lazily (like _SLOT_NAMES) so both
+# VMs and every backend agree on what "undefined" is.
+_UNSET = None
+
+
+cdef object _unset():
+    global _UNSET
+    if _UNSET is None:
+        import mini_compiler
+        _UNSET = mini_compiler._UNSET
+    return _UNSET
+
+
+cdef _undefined(int slot):
+    import mini_compiler
+    raise NameError(f"Undefined variable '{mini_compiler._SLOT_NAMES[slot]}'")
+
+
+cdef class CVM:
+    cdef public list slots
+
+    def __init__(self):
+        self.slots = []
+
+    @property
+    def env(self):
+        """Name -> value view of the slot store (for the REPL)."""
+        import mini_compiler
+        unset = _unset()
+        return {name: v for name, v in zip(mini_compiler._SLOT_NAMES,
+                                           self.slots)
+                if v is not unset}
+
+    def ensure_slots(self, int nslots):
+        cdef list slots = self.slots
+        if len(slots) < nslots:
+            slots.extend([_unset()] * (nslots - len(slots)))
+
+    def run(self, ops: bytes, args: dict, int nslots, int max_stack,
+            bint all_float=False):
+        cdef const unsigned char[:] code = ops
+        cdef Py_ssize_t i, n = len(code)
+        cdef int op, sa, sb, sp = 0
+        cdef list slots
+        self.ensure_slots(nslots)
+        slots = self.slots
+        unset = _unset()
+        if all_float:
+            import mini_compiler
+            all_float = mini_compiler._float_slots_ok(ops, args, slots)
+        if all_float:
+            stack = array("d", bytes(8 * max_stack))
+        else:
+            stack = [None] * max_stack
+        for i in range(n):
+            op = code[i]
+            if op == OP_PUSH:
+                stack[sp] = args[i]
+                sp += 1
+            elif op == OP_LOAD:
+                v = slots[<int> args[i]]
+                if v is unset:
+                    _undefined(<int> args[i])
+                stack[sp] = v
+                sp += 1
+            elif op == OP_STORE:
+                sp -= 1
+                slots[<int> args[i]] = stack[sp]
+            elif op == OP_NEG:
+                stack[sp - 1] = -stack[sp - 1]
+            elif op == OP_PRINT:
+                sp -= 1
+                print(stack[sp])
+            elif op == OP_BINOP:
+                sp -= 1
+                stack[sp - 1] = args[i](stack[sp - 1], stack[sp])
+            elif op == OP_LOAD_LOAD_BINOP:
+                sa, sb, fn = args[i]
+                a = slots[sa]; b = slots[sb]
+                if a is unset or b is unset:
+                    _undefined(sa if a is unset else sb)
+                stack[sp] = fn(a, b)
+                sp += 1
+            elif op == OP_PUSH_BINOP:
+                c, fn = args[i]
+                stack[sp - 1] = fn(stack[sp - 1], c)
+            elif op == OP_LOAD_BINOP:
+                sb, fn = args[i]
+                b = slots[sb]
+                if b is unset:
+                    _undefined(sb)
+                stack[sp - 1] = fn(stack[sp - 1], b)
+            elif op == OP_ADD_II or op == OP_ADD_RR:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] + stack[sp]
+            elif op == OP_SUB_II or op == OP_SUB_RR:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] - stack[sp]
+            elif op == OP_MUL_II or op == OP_MUL_RR:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] * stack[sp]
+            elif op == OP_DUP:
+                stack[sp] = stack[sp - 1]
+                sp += 1
+            else:
+                raise RuntimeError(f"Unknown instruction {op}")
@@ -19,126 +19,120 @@ Supported:
 Run:
     python3 mini_compiler.py
 Then type expressions. Use Ctrl+C or `exit` to quit.
+
+Set MINI_COMPILER_BACKEND=closure to execute statements as compiled
+closures, or =native to run them as CPython code objects, instead of
+the bytecode VM.
 """
 
 import math
+import operator
+import os
 import sys
 import re
+from array import array
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Union, Optional, Tuple, Dict, Any
 
 
 
 TokenType = str
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     type: TokenType
     value: Any
     pos: int
 
+# One master pattern so the whole scan runs inside the C regex engine
+# instead of a Python loop over characters.
+TOKEN_RE = re.compile(r"""
+    (?P<WS>\s+)
+  | (?P<FLOAT>\d+\.\d*)
+  | (?P<INT>\d+)
+  | (?P<IDENT>[A-Za-z_]\w*)
+  | (?P<OP>[-+*/^()=])
+""", re.VERBOSE)
+
+OP_TOKEN_TYPES = {
+    "+": "PLUS", "-": "MINUS", "*": "MUL", "/": "DIV", "^": "POW",
+    "(": "LPAREN", ")": "RPAREN", "=": "ASSIGN",
+}
+
 class Lexer:
     def __init__(self, text: str):
         self.text = text
-        self.i = 0
-        self.length = len(text)
+        # Pooled token list, cleared and refilled per reset/tokens cycle
+        # so repeated compiles reuse one allocation.
+        self._toks: List[Token] = []
 
-    def peek(self) -> str:
-        return self.text[self.i] if self.i < self.length else ""
-
-    def advance(self) -> str:
-        ch = self.peek()
-        self.i += 1
-        return ch
-
-    def skip_ws(self):
-        while self.peek() and self.peek().isspace():
-            self.advance()
-
-    def number(self, start_pos: int) -> Token:
-        s = self.peek()
-        num = ""
-        dot_seen = False
-        while self.peek() and (self.peek().isdigit() or self.peek() == "."):
-            if self.peek() == ".":
-                if dot_seen:
-                    break
-                dot_seen = True
-            num += self.advance()
-        val = float(num) if "." in num else int(num)
-        return Token("NUMBER", val, start_pos)
-
-    def ident(self, start_pos: int) -> Token:
-        ident = ""
-        while self.peek() and (self.peek().isalnum() or self.peek() == "_"):
-            ident += self.advance()
-        if ident == "print":
-            return Token("PRINT", ident, start_pos)
-        return Token("IDENT", ident, start_pos)
+    def reset(self, text: str) -> "Lexer":
+        self.text = text
+        return self
 
     def tokens(self) -> List[Token]:
-        toks: List[Token] = []
-        while self.i < self.length:
-            self.skip_ws()
-            start = self.i
-            ch = self.peek()
-            if not ch:
-                break
-            if ch.isdigit():
-                toks.append(self.number(start))
-                continue
-            if ch.isalpha() or ch == "_":
-                toks.append(self.ident(start))
+        # Hoist per-iteration lookups into locals; the loop body runs once
+        # per token so every saved LOAD_ATTR/LOAD_GLOBAL counts.
+        text = self.text
+        op_types = OP_TOKEN_TYPES
+        token = Token
+        toks = self._toks
+        del toks[:]
+        append = toks.append
+        pos = 0
+        for m in TOKEN_RE.finditer(text):
+            start = m.start()
+            if start != pos:
+                raise SyntaxError(
+                    f"Unexpected character '{text[pos]}' at {pos}")
+            pos = m.end()
+            kind = m.lastgroup
+            if kind == "WS":
                 continue
-            # single char tokens
-            if ch == "+":
-                toks.append(Token("PLUS", self.advance(), start)); continue
-            if ch == "-":
-                toks.append(Token("MINUS", self.advance(), start)); continue
-            if ch == "*":
-                toks.append(Token("MUL", self.advance(), start)); continue
-            if ch == "/":
-                toks.append(Token("DIV", self.advance(), start)); continue
-            if ch == "^":
-                toks.append(Token("POW", self.advance(), start)); continue
-            if ch == "(":
-                toks.append(Token("LPAREN", self.advance(), start)); continue
-            if ch == ")":
-                toks.append(Token("RPAREN", self.advance(), start)); continue
-            if ch == "=":
-                toks.append(Token("ASSIGN", self.advance(), start)); continue
-            # Unknown character
-            raise SyntaxError(f"Unexpected character '{ch}' at {start}")
-        toks.append(Token("EOF", None, self.i))
+            s = m.group()
+            if kind == "INT":
+                append(token("NUMBER", int(s), start))
+            elif kind == "FLOAT":
+                append(token("NUMBER", float(s), start))
+            elif kind == "IDENT":
+                append(token("PRINT" if s == "print" else "IDENT",
+                             s, start))
+            else:
+                append(token(op_types[s], s, start))
+        if pos != len(text):
+            raise SyntaxError(
+                f"Unexpected character '{text[pos]}' at {pos}")
+        append(token("EOF", None, len(text)))
         return toks
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Num:
     value: float
 
-@dataclass
+@dataclass(slots=True)
 class Var:
     name: str
 
-@dataclass
+@dataclass(slots=True)
 class BinOp:
     op: str
     left: Any
     right: Any
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp:
     op: str
     expr: Any
 
-@dataclass
+@dataclass(slots=True)
 class Assign:
     name: str
     expr: Any
 
-@dataclass
+@dataclass(slots=True)
 class PrintStmt:
     expr: Any
 
@@ -151,6 +145,11 @@ class Parser:
         self.tokens = tokens
         self.i = 0
 
+    def reset(self, tokens: List[Token]) -> "Parser":
+        self.tokens = tokens
+        self.i = 0
+        return self
+
     def peek(self) -> Token:
         return self.tokens[self.i]
 
@@ -188,44 +187,41 @@ class Parser:
                 return Assign(ident_tok.value, e)
         return self.expr()
 
-    def expr(self):
-        node = self.term()
-        while self.at("PLUS") or self.at("MINUS"):
-            if self.at("PLUS"):
-                self.eat("PLUS")
-                node = BinOp("+", node, self.term())
-            else:
-                self.eat("MINUS")
-                node = BinOp("-", node, self.term())
-        return node
-
-    def term(self):
-        node = self.power()
-        while self.at("MUL") or self.at("DIV"):
-            if self.at("MUL"):
-                self.eat("MUL")
-                node = BinOp("*", node, self.power())
-            else:
-                self.eat("DIV")
-                node = BinOp("/", node, self.power())
-        return node
-
-    def power(self):
+    # (precedence, right-associative?, AST operator) per infix token type.
+    INFIX = {
+        "PLUS": (1, False, "+"),
+        "MINUS": (1, False, "-"),
+        "MUL": (2, False, "*"),
+        "DIV": (2, False, "/"),
+        "POW": (3, True, "^"),
+    }
+
+    def expr(self, min_prec: int = 1):
+        # Precedence climbing: one loop handles every infix level instead
+        # of one Python call frame per level per operand.
         node = self.unary()
-        if self.at("POW"):
-            self.eat("POW")
-            # right-associative
-            node = BinOp("^", node, self.power())
-        return node
+        infix = self.INFIX
+        while True:
+            info = infix.get(self.peek().type)
+            if info is None or info[0] < min_prec:
+                return node
+            prec, right_assoc, op = info
+            self.i += 1
+            rhs = self.expr(prec if right_assoc else prec + 1)
+            node = BinOp(op, node, rhs)
 
     def unary(self):
-        if self.at("PLUS"):
-            self.eat("PLUS")
-            return self.unary()
-        if self.at("MINUS"):
-            self.eat("MINUS")
-            return UnaryOp("-", self.unary())
-        return self.primary()
+        # Fold runs of prefix signs: an even number of '-' cancels out,
+        # so at most one NEG ever reaches codegen.
+        negate = False
+        while True:
+            if self.at("MINUS"):
+                negate = not negate
+            elif not self.at("PLUS"):
+                break
+            self.i += 1
+        node = self.primary()
+        return UnaryOp("-", node) if negate else node
 
     def primary(self):
         tok = self.peek()
@@ -244,98 +240,427 @@ class Parser:
 
 
 
-@dataclass
-class Instr:
-    op: str
-    arg: Any = None
+# Opcodes are small ints so the VM compares machine integers instead of
+# interning/hashing strings on every dispatch. Opcodes below HAS_ARG take
+# no argument; those with the bit set have an entry in the sparse args
+# dict, so zero-arg instructions carry no placeholder at all.
+HAS_ARG = 0x80
+
+OP_NEG = 0
+OP_PRINT = 1
+# Type-specialized binops, emitted when inference proves both operands
+# int (II) or both float (RR). Their handlers compute the same result as
+# the generic forms, so a stale specialization is never wrong - merely
+# unspecialized - which keeps cached bytecode valid when a variable
+# later changes type.
+OP_ADD_II = 2
+OP_ADD_RR = 3
+OP_SUB_II = 4
+OP_SUB_RR = 5
+OP_MUL_II = 6
+OP_MUL_RR = 7
+OP_DUP = 8
+
+OP_PUSH = HAS_ARG | 0
+OP_LOAD = HAS_ARG | 1
+OP_STORE = HAS_ARG | 2
+# Generic arithmetic: one opcode whose arg is the operator function, so
+# the VM has a single binop branch instead of one per operator.
+OP_BINOP = HAS_ARG | 3
+# Superinstructions: fused by Codegen.optimize so common 2-3 op patterns
+# cost a single dispatch. Their args carry the operator function too.
+OP_LOAD_LOAD_BINOP = HAS_ARG | 4
+OP_PUSH_BINOP = HAS_ARG | 5
+OP_LOAD_BINOP = HAS_ARG | 6
+
+OP_NAMES = {
+    OP_NEG: "NEG", OP_PRINT: "PRINT", OP_ADD_II: "ADD_II",
+    OP_ADD_RR: "ADD_RR", OP_SUB_II: "SUB_II", OP_SUB_RR: "SUB_RR",
+    OP_MUL_II: "MUL_II", OP_MUL_RR: "MUL_RR", OP_DUP: "DUP",
+    OP_PUSH: "PUSH",
+    OP_LOAD: "LOAD", OP_STORE: "STORE", OP_BINOP: "BINOP",
+    OP_LOAD_LOAD_BINOP: "LOAD_LOAD_BINOP", OP_PUSH_BINOP: "PUSH_BINOP",
+    OP_LOAD_BINOP: "LOAD_BINOP",
+}
+
+# Operator function per source operator, shared by fold, codegen and the
+# closure backend.
+BINOP_FNS = {"+": operator.add, "-": operator.sub, "*": operator.mul,
+             "/": operator.truediv, "^": operator.pow}
+
+# Specialized opcode per (source operator, inferred type).
+_SPECIALIZE = {("+", "i"): OP_ADD_II, ("+", "f"): OP_ADD_RR,
+               ("-", "i"): OP_SUB_II, ("-", "f"): OP_SUB_RR,
+               ("*", "i"): OP_MUL_II, ("*", "f"): OP_MUL_RR}
+
+# Operator function behind each specialized opcode (for re-genericizing
+# during fusion).
+_SPEC_FNS = {OP_ADD_II: operator.add, OP_ADD_RR: operator.add,
+             OP_SUB_II: operator.sub, OP_SUB_RR: operator.sub,
+             OP_MUL_II: operator.mul, OP_MUL_RR: operator.mul}
+
+def _binop_fn(op: int, arg: Any):
+    """Operator function if (op, arg) is a fusable binop, else None."""
+    if op == OP_BINOP:
+        return arg
+    return _SPEC_FNS.get(op)
+
+# Inferred type per variable slot ('i' int, 'f' float; absent = unknown).
+_SLOT_TYPES: Dict[int, str] = {}
+
+# Net stack effect per opcode, used to size the operand stack at compile
+# time. Peaks coincide with post-instruction depths because every opcode
+# pops before it pushes.
+_STACK_EFFECT = {
+    OP_PUSH: 1, OP_LOAD: 1, OP_STORE: -1, OP_NEG: 0, OP_PRINT: -1,
+    OP_BINOP: -1, OP_LOAD_LOAD_BINOP: 1, OP_PUSH_BINOP: 0,
+    OP_LOAD_BINOP: 0, OP_ADD_II: -1, OP_ADD_RR: -1, OP_SUB_II: -1,
+    OP_SUB_RR: -1, OP_MUL_II: -1, OP_MUL_RR: -1, OP_DUP: 1,
+}
+
+# Global name -> slot registry, shared by Codegen and VM so slot ids stay
+# stable across REPL lines (and across cached compiles).
+_SLOT_INDEX: Dict[str, int] = {}
+_SLOT_NAMES: List[str] = []
+_UNSET = object()
+
+def slot_for(name: str) -> int:
+    idx = _SLOT_INDEX.get(name)
+    if idx is None:
+        idx = len(_SLOT_NAMES)
+        _SLOT_INDEX[name] = idx
+        _SLOT_NAMES.append(name)
+    return idx
+
+def _undefined(slot: int):
+    raise NameError(f"Undefined variable '{_SLOT_NAMES[slot]}'")
 
-Bytecode = List[Instr]
 
 class Codegen:
     def __init__(self):
-        self.code: Bytecode = []
+        self.reset()
+
+    def reset(self) -> "Codegen":
+        # Bytecode is a dense array of opcode bytes plus a sparse dict of
+        # args keyed by instruction index (only HAS_ARG opcodes appear).
+        # Rebind rather than clear: compile_line hands the previous
+        # ops/args to the lru_cache, so they must never be mutated.
+        self.ops: array = array("B")
+        self.args: Dict[int, Any] = {}
+        # Abstract stack depth, tracked per emit so the VM can preallocate
+        # the operand stack (fusion only ever lowers the peak).
+        self.depth = 0
+        self.max_stack = 0
+        return self
+
+    def emit(self, op: int, arg: Any = None):
+        if op & HAS_ARG:
+            self.args[len(self.ops)] = arg
+        self.ops.append(op)
+        self.depth += _STACK_EFFECT[op]
+        if self.depth > self.max_stack:
+            self.max_stack = self.depth
+
+    def optimize(self):
+        """Peephole pass fusing LOAD/PUSH + binop runs into superinstructions.
+
+        The fused value is always the right operand (it was on top of the
+        stack), so SUB/DIV stay correct.
+        """
+        ops, args = self.ops, self.args
+        out_ops: array = array("B")
+        out_args: Dict[int, Any] = {}
+        i = 0
+        n = len(ops)
+        while i < n:
+            op = ops[i]
+            if op == OP_LOAD and i + 2 < n and ops[i + 1] == OP_LOAD:
+                fn = _binop_fn(ops[i + 2], args.get(i + 2))
+                if fn is not None:
+                    out_args[len(out_ops)] = (args[i], args[i + 1], fn)
+                    out_ops.append(OP_LOAD_LOAD_BINOP)
+                    i += 3
+                    continue
+            if op == OP_PUSH and i + 1 < n:
+                fn = _binop_fn(ops[i + 1], args.get(i + 1))
+                if fn is not None:
+                    out_args[len(out_ops)] = (args[i], fn)
+                    out_ops.append(OP_PUSH_BINOP)
+                    i += 2
+                    continue
+            if op == OP_LOAD and i + 1 < n:
+                fn = _binop_fn(ops[i + 1], args.get(i + 1))
+                if fn is not None:
+                    out_args[len(out_ops)] = (args[i], fn)
+                    out_ops.append(OP_LOAD_BINOP)
+                    i += 2
+                    continue
+            if op & HAS_ARG:
+                out_args[len(out_ops)] = args[i]
+            out_ops.append(op)
+            i += 1
+        self.ops, self.args = out_ops, out_args
+
+    def fold(self, node: Stmt) -> Stmt:
+        """Collapse constant subtrees to a single Num at compile time."""
+        t = type(node)
+        if t is BinOp:
+            left = self.fold(node.left)
+            right = self.fold(node.right)
+            if type(left) is Num and type(right) is Num:
+                try:
+                    return Num(BINOP_FNS[node.op](left.value, right.value))
+                except ArithmeticError:
+                    # Leave the subtree for the VM so the error fires in
+                    # evaluation order, not at compile time.
+                    pass
+            return BinOp(node.op, left, right)
+        if t is UnaryOp:
+            expr = self.fold(node.expr)
+            if type(expr) is Num:
+                return Num(-expr.value)
+            return UnaryOp(node.op, expr)
+        if t is Assign:
+            return Assign(node.name, self.fold(node.expr))
+        if t is PrintStmt:
+            return PrintStmt(self.fold(node.expr))
+        return node
 
-    def emit(self, op: str, arg: Any = None):
-        self.code.append(Instr(op, arg))
+    def infer(self, node: Stmt) -> Optional[str]:
+        """Best-effort static type of an expression: 'i', 'f' or None."""
+        t = type(node)
+        if t is Num:
+            t_v = type(node.value)
+            if t_v is int:
+                return "i"
+            # Folding can produce complex constants; only exact floats
+            # are 'f'.
+            return "f" if t_v is float else None
+        if t is Var:
+            return _SLOT_TYPES.get(slot_for(node.name))
+        if t is UnaryOp:
+            return self.infer(node.expr)
+        if t is BinOp:
+            lt = self.infer(node.left)
+            rt = self.infer(node.right)
+            if lt is None or rt is None:
+                return None
+            if node.op == "/":
+                # true division always yields float
+                return "f"
+            if node.op == "^":
+                # int ** negative int is float and float ** float is
+                # complex for negative bases, so ^ is never certain
+                return None
+            return "i" if lt == rt == "i" else "f"
+        return None
+
+    def all_float(self, node: Stmt) -> bool:
+        """True if every value the statement touches is provably float.
+
+        Such statements can run on an array('d') stack of raw doubles.
+        ^ disqualifies because float ** float can leave the reals for
+        negative bases.
+        """
+        t = type(node)
+        if t is Num:
+            return type(node.value) is float
+        if t is Var:
+            return _SLOT_TYPES.get(slot_for(node.name)) == "f"
+        if t is UnaryOp:
+            return self.all_float(node.expr)
+        if t is BinOp:
+            if node.op == "^":
+                return False
+            return self.all_float(node.left) and self.all_float(node.right)
+        if t is Assign or t is PrintStmt:
+            return self.all_float(node.expr)
+        return False
 
     def gen(self, node: Stmt):
         t = type(node)
         if t is Num:
-            self.emit("PUSH", node.value)
+            self.emit(OP_PUSH, node.value)
         elif t is Var:
-            self.emit("LOAD", node.name)
+            self.emit(OP_LOAD, slot_for(node.name))
         elif t is UnaryOp:
             self.gen(node.expr)
             if node.op == "-":
-                self.emit("NEG")
+                self.emit(OP_NEG)
             else:
                 raise NotImplementedError(f"Unary {node.op}")
         elif t is BinOp:
+            if (node.op == "^" and type(node.right) is Num
+                    and type(node.right.value) is int
+                    and 2 <= node.right.value <= 4):
+                # Strength reduction: x^k for small integer k becomes
+                # DUPs plus repeated multiplies, which beats pow by a
+                # wide margin.
+                self.gen(node.left)
+                ty = self.infer(node.left)
+                mul = _SPECIALIZE.get(("*", ty)) if ty is not None else None
+                for _ in range(node.right.value - 1):
+                    self.emit(OP_DUP)
+                for _ in range(node.right.value - 1):
+                    if mul is not None:
+                        self.emit(mul)
+                    else:
+                        self.emit(OP_BINOP, operator.mul)
+                return
             self.gen(node.left)
             self.gen(node.right)
-            if node.op == "+":
-                self.emit("ADD")
-            elif node.op == "-":
-                self.emit("SUB")
-            elif node.op == "*":
-                self.emit("MUL")
-            elif node.op == "/":
-                self.emit("DIV")
-            elif node.op == "^":
-                self.emit("POW")
-            else:
+            fn = BINOP_FNS.get(node.op)
+            if fn is None:
                 raise NotImplementedError(f"BinOp {node.op}")
+            ty = self.infer(node.left)
+            if ty is not None and ty == self.infer(node.right):
+                spec = _SPECIALIZE.get((node.op, ty))
+            else:
+                spec = None
+            if spec is not None:
+                self.emit(spec)
+            else:
+                self.emit(OP_BINOP, fn)
         elif t is Assign:
             self.gen(node.expr)
-            self.emit("STORE", node.name)
+            slot = slot_for(node.name)
+            prev = _SLOT_TYPES.get(slot)
+            ty = self.infer(node.expr)
+            if ty is None:
+                _SLOT_TYPES.pop(slot, None)
+            else:
+                _SLOT_TYPES[slot] = ty
+            if ty != prev:
+                # Cached bytecode may have been laid out for the old type
+                # (notably the all-float stack); recompile on demand.
+                compile_line.cache_clear()
+            self.emit(OP_STORE, slot)
         elif t is PrintStmt:
             self.gen(node.expr)
-            self.emit("PRINT")
+            self.emit(OP_PRINT)
         else:
-           
+
             self.gen(node)
-            self.emit("PRINT")
+            self.emit(OP_PRINT)
+
+def _float_slots_ok(ops: bytes, args: Dict[int, Any],
+                    slots: List[Any]) -> bool:
+    """True if every slot the bytecode reads currently holds a float.
+
+    _SLOT_TYPES is recorded at compile time, so an assignment that fails
+    at runtime can leave a slot typed 'f' while it still holds an older
+    value; the raw-double stack is only safe when the live values agree.
+    """
+    for i in range(len(ops)):
+        op = ops[i]
+        if op == OP_LOAD:
+            if type(slots[args[i]]) is not float:
+                return False
+        elif op == OP_LOAD_LOAD_BINOP:
+            sa, sb, _ = args[i]
+            if type(slots[sa]) is not float or type(slots[sb]) is not float:
+                return False
+        elif op == OP_LOAD_BINOP:
+            sb, _ = args[i]
+            if type(slots[sb]) is not float:
+                return False
+    return True
 
 class VM:
     def __init__(self):
-        self.stack: List[float] = []
-        self.env: Dict[str, float] = {}
-
-    def run(self, code: Bytecode):
-        for ins in code:
-            op, arg = ins.op, ins.arg
-            if op == "PUSH":
-                self.stack.append(arg)
-            elif op == "LOAD":
-                if arg not in self.env:
-                    raise NameError(f"Undefined variable '{arg}'")
-                self.stack.append(self.env[arg])
-            elif op == "STORE":
-                val = self.stack.pop()
-                self.env[arg] = val
-            elif op == "NEG":
-                a = self.stack.pop()
-                self.stack.append(-a)
-            elif op == "ADD":
-                b, a = self.stack.pop(), self.stack.pop()
-                self.stack.append(a + b)
-            elif op == "SUB":
-                b, a = self.stack.pop(), self.stack.pop()
-                self.stack.append(a - b)
-            elif op == "MUL":
-                b, a = self.stack.pop(), self.stack.pop()
-                self.stack.append(a * b)
-            elif op == "DIV":
-                b, a = self.stack.pop(), self.stack.pop()
-                self.stack.append(a / b)
-            elif op == "POW":
-                b, a = self.stack.pop(), self.stack.pop()
-                self.stack.append(a ** b)
-            elif op == "PRINT":
-                val = self.stack.pop()
-                print(val)
+        # Variable storage indexed by compile-time slot id; _UNSET marks
+        # slots that were allocated but never assigned.
+        self.slots: List[Any] = []
+
+    @property
+    def env(self) -> Dict[str, float]:
+        """Name -> value view of the slot store (for the REPL)."""
+        return {name: v for name, v in zip(_SLOT_NAMES, self.slots)
+                if v is not _UNSET}
+
+    def ensure_slots(self, nslots: int):
+        slots = self.slots
+        if len(slots) < nslots:
+            slots.extend([_UNSET] * (nslots - len(slots)))
+
+    def run(self, ops: bytes, args: Dict[int, Any], nslots: int,
+            max_stack: int, all_float: bool = False):
+        # Hoist everything touched per instruction into locals: LOAD_FAST
+        # is far cheaper than LOAD_ATTR + method lookup in CPython.
+        # The operand stack is preallocated to the compile-time high-water
+        # mark and indexed through sp, avoiding list resizes in the loop.
+        # Statements proven float-only run on an array('d') of raw
+        # doubles instead of a list of boxed PyFloats, provided the
+        # slots they read really hold floats right now (a failed
+        # assignment can leave a stale value behind its inferred type).
+        slots = self.slots
+        self.ensure_slots(nslots)
+        if all_float and _float_slots_ok(ops, args, slots):
+            stack = array("d", bytes(8 * max_stack))
+        else:
+            stack = [None] * max_stack
+        sp = 0
+        for i in range(len(ops)):
+            op = ops[i]
+            if op == OP_PUSH:
+                stack[sp] = args[i]
+                sp += 1
+            elif op == OP_LOAD:
+                v = slots[args[i]]
+                if v is _UNSET:
+                    _undefined(args[i])
+                stack[sp] = v
+                sp += 1
+            elif op == OP_STORE:
+                sp -= 1
+                slots[args[i]] = stack[sp]
+            elif op == OP_NEG:
+                stack[sp - 1] = -stack[sp - 1]
+            elif op == OP_PRINT:
+                sp -= 1
+                print(stack[sp])
+            elif op == OP_BINOP:
+                sp -= 1
+                stack[sp - 1] = args[i](stack[sp - 1], stack[sp])
+            elif op == OP_LOAD_LOAD_BINOP:
+                sa, sb, fn = args[i]
+                a = slots[sa]
+                b = slots[sb]
+                if a is _UNSET or b is _UNSET:
+                    _undefined(sa if a is _UNSET else sb)
+                stack[sp] = fn(a, b)
+                sp += 1
+            elif op == OP_PUSH_BINOP:
+                c, fn = args[i]
+                stack[sp - 1] = fn(stack[sp - 1], c)
+            elif op == OP_LOAD_BINOP:
+                sb, fn = args[i]
+                b = slots[sb]
+                if b is _UNSET:
+                    _undefined(sb)
+                stack[sp - 1] = fn(stack[sp - 1], b)
+            elif op == OP_ADD_II or op == OP_ADD_RR:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] + stack[sp]
+            elif op == OP_SUB_II or op == OP_SUB_RR:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] - stack[sp]
+            elif op == OP_MUL_II or op == OP_MUL_RR:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] * stack[sp]
+            elif op == OP_DUP:
+                stack[sp] = stack[sp - 1]
+                sp += 1
             else:
-                raise RuntimeError(f"Unknown instruction {op}")
+                raise RuntimeError(
+                    f"Unknown instruction {OP_NAMES.get(op, op)}")
+
+try:
+    # Optional Cython accelerator for the dispatch loop; build it with
+    # `cythonize -3 --inplace cvm.pyx`. Falls back to the pure-Python VM.
+    from cvm import CVM as VM  # type: ignore[assignment]
+except ImportError:
+    pass
 
 
 
@@ -349,14 +674,317 @@ Examples:
 Type 'env' to see variables, 'exit' to quit.
 """
 
-def compile_and_run(line: str, vm: VM):
-    lexer = Lexer(line)
-    tokens = lexer.tokens()
-    parser = Parser(tokens)
-    ast = parser.parse()
-    cg = Codegen()
+# Reusable compile pipeline objects: one Lexer/Parser/Codegen for the
+# whole process instead of three fresh allocations per line.
+_LEXER = Lexer("")
+_PARSER = Parser([])
+_CODEGEN = Codegen()
+
+@lru_cache(maxsize=256)
+def compile_line(line: str) -> Tuple[bytes, Dict[int, Any], int, int, bool]:
+    """Compile one source line to frozen bytecode, memoized per line.
+
+    Returns (ops, args, nslots, max_stack, all_float). The args dict is
+    sparse (HAS_ARG opcodes only) and never mutated after compilation,
+    so cached entries stay shareable; all_float marks statements eligible
+    for the raw-double stack.
+    """
+    tokens = _LEXER.reset(line).tokens()
+    ast = _PARSER.reset(tokens).parse()
+    cg = _CODEGEN.reset()
+    ast = cg.fold(ast)
     cg.gen(ast)
-    vm.run(cg.code)
+    cg.optimize()
+    return (bytes(cg.ops), cg.args, len(_SLOT_NAMES), cg.max_stack,
+            cg.all_float(ast))
+
+# Optional Numba acceleration for batch (argv) execution: the dispatch
+# loop is lowered to typed numpy arrays and compiled to native code.
+# Entirely absent unless numba and numpy are installed.
+try:
+    import numpy as _np
+    from numba import njit as _njit
+except ImportError:
+    _np = None
+
+# Kernel-level codes for the four closed float binops (pow never appears
+# in all-float bytecode).
+_NUMBA_BINOPS = {operator.add: 0, operator.sub: 1, operator.mul: 2,
+                 operator.truediv: 3}
+
+if _np is not None:
+    @_njit(cache=True)
+    def _numba_kernel(ops, a1, a2, bop, fargs, slots, max_stack):
+        stack = _np.empty(max_stack, _np.float64)
+        sp = 0
+        for i in range(ops.shape[0]):
+            op = ops[i]
+            if op == OP_PUSH:
+                stack[sp] = fargs[i]
+                sp += 1
+            elif op == OP_LOAD:
+                stack[sp] = slots[a1[i]]
+                sp += 1
+            elif op == OP_STORE:
+                sp -= 1
+                slots[a1[i]] = stack[sp]
+            elif op == OP_NEG:
+                stack[sp - 1] = -stack[sp - 1]
+            elif op == OP_PRINT:
+                sp -= 1
+                print(stack[sp])
+            elif op == OP_BINOP:
+                sp -= 1
+                b = stack[sp]
+                a = stack[sp - 1]
+                c = bop[i]
+                if c == 0:
+                    stack[sp - 1] = a + b
+                elif c == 1:
+                    stack[sp - 1] = a - b
+                elif c == 2:
+                    stack[sp - 1] = a * b
+                else:
+                    stack[sp - 1] = a / b
+            elif op == OP_LOAD_LOAD_BINOP:
+                a = slots[a1[i]]
+                b = slots[a2[i]]
+                c = bop[i]
+                if c == 0:
+                    stack[sp] = a + b
+                elif c == 1:
+                    stack[sp] = a - b
+                elif c == 2:
+                    stack[sp] = a * b
+                else:
+                    stack[sp] = a / b
+                sp += 1
+            elif op == OP_PUSH_BINOP:
+                b = fargs[i]
+                a = stack[sp - 1]
+                c = bop[i]
+                if c == 0:
+                    stack[sp - 1] = a + b
+                elif c == 1:
+                    stack[sp - 1] = a - b
+                elif c == 2:
+                    stack[sp - 1] = a * b
+                else:
+                    stack[sp - 1] = a / b
+            elif op == OP_LOAD_BINOP:
+                b = slots[a1[i]]
+                a = stack[sp - 1]
+                c = bop[i]
+                if c == 0:
+                    stack[sp - 1] = a + b
+                elif c == 1:
+                    stack[sp - 1] = a - b
+                elif c == 2:
+                    stack[sp - 1] = a * b
+                else:
+                    stack[sp - 1] = a / b
+            elif op == OP_ADD_II or op == OP_ADD_RR:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] + stack[sp]
+            elif op == OP_SUB_II or op == OP_SUB_RR:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] - stack[sp]
+            elif op == OP_MUL_II or op == OP_MUL_RR:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] * stack[sp]
+            elif op == OP_DUP:
+                stack[sp] = stack[sp - 1]
+                sp += 1
+
+@lru_cache(maxsize=256)
+def _lower_for_numba(line: str):
+    """Lower a float-only compiled line to typed arrays for the kernel.
+
+    Returns None when the line is not eligible (mixed types, pow, or
+    numba unavailable).
+    """
+    if _np is None:
+        return None
+    ops, args, nslots, max_stack, all_float = compile_line(line)
+    if not all_float:
+        return None
+    n = len(ops)
+    ops_a = _np.frombuffer(ops, dtype=_np.uint8).astype(_np.int32)
+    a1 = _np.zeros(n, _np.int32)
+    a2 = _np.zeros(n, _np.int32)
+    bop = _np.zeros(n, _np.int32)
+    fargs = _np.zeros(n, _np.float64)
+    reads = set()
+    writes = set()
+    for i in range(n):
+        op = ops[i]
+        if op == OP_PUSH:
+            fargs[i] = args[i]
+        elif op == OP_LOAD:
+            a1[i] = args[i]
+            reads.add(args[i])
+        elif op == OP_STORE:
+            a1[i] = args[i]
+            writes.add(args[i])
+        elif op == OP_BINOP:
+            c = _NUMBA_BINOPS.get(args[i])
+            if c is None:
+                return None
+            bop[i] = c
+        elif op == OP_LOAD_LOAD_BINOP:
+            sa, sb, fn = args[i]
+            c = _NUMBA_BINOPS.get(fn)
+            if c is None:
+                return None
+            a1[i] = sa
+            a2[i] = sb
+            bop[i] = c
+            reads.add(sa)
+            reads.add(sb)
+        elif op == OP_PUSH_BINOP:
+            const, fn = args[i]
+            c = _NUMBA_BINOPS.get(fn)
+            if c is None:
+                return None
+            fargs[i] = const
+            bop[i] = c
+        elif op == OP_LOAD_BINOP:
+            sb, fn = args[i]
+            c = _NUMBA_BINOPS.get(fn)
+            if c is None:
+                return None
+            a1[i] = sb
+            bop[i] = c
+            reads.add(sb)
+        elif op not in (OP_NEG, OP_PRINT, OP_DUP, OP_ADD_II, OP_ADD_RR,
+                        OP_SUB_II, OP_SUB_RR, OP_MUL_II, OP_MUL_RR):
+            return None
+    return (ops_a, a1, a2, bop, fargs, frozenset(reads),
+            frozenset(writes), nslots, max_stack)
+
+def run_batch(line: str, vm: "VM"):
+    """Batch-mode entry: run on the Numba kernel when eligible.
+
+    Pays the JIT warm-up once, after which float-only statements execute
+    at native speed. Anything ineligible falls back to compile_and_run.
+    Note the kernel follows IEEE semantics, so float division by zero
+    yields inf/nan instead of raising.
+    """
+    if _np is not None and BACKEND == "vm":
+        lowered = _lower_for_numba(line)
+        if lowered is not None:
+            (ops_a, a1, a2, bop, fargs, reads, writes,
+             nslots, max_stack) = lowered
+            vm.ensure_slots(nslots)
+            if all(type(vm.slots[s]) is float for s in reads):
+                slots_a = _np.zeros(nslots, _np.float64)
+                for s in reads:
+                    slots_a[s] = vm.slots[s]
+                _numba_kernel(ops_a, a1, a2, bop, fargs, slots_a,
+                              max_stack)
+                for s in writes:
+                    vm.slots[s] = float(slots_a[s])
+                return
+    compile_and_run(line, vm)
+
+# Execution backend, selected via the environment:
+#   vm      - bytecode + VM dispatch loop (default)
+#   closure - compile the AST to nested closures, no interpreter at all
+#   native  - translate to Python source and exec a CPython code object
+BACKEND = os.environ.get("MINI_COMPILER_BACKEND", "vm")
+
+def to_py(node) -> str:
+    """Pretty-print an expression subtree as Python source."""
+    t = type(node)
+    if t is Num:
+        return repr(node.value)
+    if t is Var:
+        return node.name
+    if t is UnaryOp:
+        return f"(-{to_py(node.expr)})"
+    if t is BinOp:
+        op = "**" if node.op == "^" else node.op
+        return f"({to_py(node.left)} {op} {to_py(node.right)})"
+    raise NotImplementedError(f"Node {t.__name__}")
+
+@lru_cache(maxsize=256)
+def compile_native(line: str):
+    """Compile one source line to a CPython code object, memoized."""
+    ast = _PARSER.reset(_LEXER.reset(line).tokens()).parse()
+    t = type(ast)
+    if t is Assign:
+        src = f"{ast.name} = {to_py(ast.expr)}"
+    elif t is PrintStmt:
+        src = f"print({to_py(ast.expr)})"
+    else:
+        src = to_py(ast)
+    return compile(src, "<mini>", "exec")
+
+def run_as_native(line: str, vm: VM):
+    # exec against a name->value view of the slots, then write updates
+    # back, so all backends share the same variable store.
+    code = compile_native(line)
+    ns = vm.env
+    try:
+        exec(code, {"__builtins__": {"print": print}}, ns)
+    except NameError as e:
+        raise NameError(f"Undefined variable '{e.name}'") from None
+    for name, val in ns.items():
+        idx = slot_for(name)
+        vm.ensure_slots(idx + 1)
+        vm.slots[idx] = val
+
+def _closure_expr(node, slots):
+    """Compile an expression subtree to a 0-arg callable over vm slots."""
+    t = type(node)
+    if t is Num:
+        v = node.value
+        return lambda: v
+    if t is Var:
+        idx = slot_for(node.name)
+        def load():
+            v = slots[idx]
+            if v is _UNSET:
+                _undefined(idx)
+            return v
+        return load
+    if t is UnaryOp:
+        ec = _closure_expr(node.expr, slots)
+        return lambda: -ec()
+    if t is BinOp:
+        fn = BINOP_FNS[node.op]
+        lc = _closure_expr(node.left, slots)
+        rc = _closure_expr(node.right, slots)
+        return lambda: fn(lc(), rc())
+    raise NotImplementedError(f"Node {t.__name__}")
+
+def run_as_closure(ast: Stmt, vm: VM):
+    slots = vm.slots
+    t = type(ast)
+    if t is Assign:
+        ec = _closure_expr(ast.expr, slots)
+        idx = slot_for(ast.name)
+        vm.ensure_slots(len(_SLOT_NAMES))
+        slots[idx] = ec()
+    elif t is PrintStmt:
+        ec = _closure_expr(ast.expr, slots)
+        vm.ensure_slots(len(_SLOT_NAMES))
+        print(ec())
+    else:
+        ec = _closure_expr(ast, slots)
+        vm.ensure_slots(len(_SLOT_NAMES))
+        ec()
+
+def compile_and_run(line: str, vm: VM):
+    if BACKEND == "closure":
+        ast = _PARSER.reset(_LEXER.reset(line).tokens()).parse()
+        run_as_closure(_CODEGEN.fold(ast), vm)
+        return
+    if BACKEND == "native":
+        run_as_native(line, vm)
+        return
+    ops, args, nslots, max_stack, all_float = compile_line(line)
+    vm.run(ops, args, nslots, max_stack, all_float)
 
 def repl():
     vm = VM()
@@ -382,6 +1010,6 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         
         vm = VM()
-        compile_and_run(" ".join(sys.argv[1:]), vm)
+        run_batch(" ".join(sys.argv[1:]), vm)
     else:
         repl()